@@ -14,9 +14,11 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional, Tuple, List
-from urllib.parse import urlencode, urlparse, urlunparse, parse_qsl
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+import functools
+import json
+import os
 import pathlib
-import yaml
 
 
 DEFAULT_CONFIG_PATH = pathlib.Path("jm_bot/config.yml")
@@ -29,6 +31,8 @@ class OneBotConfig:
     connect_timeout: int = 10
     reconnect_interval: int = 3
     use_query_token: bool = False
+    # WS 压缩（permessage-deflate）："auto" 对本机地址关闭、其他地址开启；"deflate" 始终开启；"none" 始终关闭
+    compression: str = "auto"
 
 
 @dataclass
@@ -63,6 +67,19 @@ def _ensure_int(v: Any, default: int) -> int:
         return default
 
 
+def _ensure_compression(v: Any, default: str = "auto") -> str:
+    if isinstance(v, bool):
+        return "deflate" if v else "none"
+    if v is None:
+        return default
+    s = str(v).strip().lower()
+    if s in ("auto", "deflate", "none"):
+        return s
+    if s in ("false", "off", "no", "0", "null", ""):
+        return "none"
+    raise ConfigError(f"onebot.compression 只能为 auto / deflate / none：{v}")
+
+
 def _ensure_bool(v: Any, default: bool) -> bool:
     if isinstance(v, bool):
         return v
@@ -87,15 +104,81 @@ def _ensure_int_list(v: Any) -> List[int]:
     if isinstance(v, list):
         for item in v:
             try:
-                if isinstance(item, str) and item.isdigit():
-                    out.append(int(item))
-                else:
-                    out.append(int(item))
+                out.append(int(item))
             except Exception:
                 continue
     return out
 
 
+def _yaml_load(f: Any) -> Any:
+    """
+    延迟导入 PyYAML（命中 JSON 旁路缓存时无需加载）。
+    优先使用 libyaml 提供的 C 加载器；设置 JM_BOT_DISABLE_CYAML=1 可强制使用纯 Python 加载器（便于调试）。
+    """
+    import yaml
+
+    if os.environ.get("JM_BOT_DISABLE_CYAML"):
+        loader = yaml.SafeLoader
+    else:
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(f, Loader=loader)
+
+
+def _load_yaml_with_json_sidecar(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    优先读取同目录下的 <文件名>.json 旁路缓存；
+    缓存内记录了来源 YAML 的 (mtime_ns, size)，两者与当前文件完全一致时才有效
+    （不比较先后：cp -p / rsync -a / 解压 / 还原备份都可能让新文件的 mtime 更早）。
+    否则解析 YAML，并在结果可无损转为 JSON 时写出旁路缓存。
+    """
+    sidecar = path + ".json"
+    try:
+        with open(sidecar, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if (
+            isinstance(cached, dict)
+            and cached.get("src") == [mtime_ns, size]
+            and isinstance(cached.get("data"), dict)
+        ):
+            return cached["data"]
+    except (OSError, ValueError):
+        pass
+
+    with open(path, "r", encoding="utf-8") as f:
+        raw = _yaml_load(f) or {}
+    try:
+        # 仅当 JSON 往返结果一致时才缓存（如非字符串键、日期等无法无损表示）
+        data_json = json.dumps(raw, ensure_ascii=False)
+        if json.loads(data_json) == raw:
+            content = f'{{"src": [{mtime_ns}, {size}], "data": {data_json}}}'
+            tmp = sidecar + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp, sidecar)
+    except (OSError, TypeError, ValueError):
+        pass
+    return raw
+
+
+@functools.lru_cache(maxsize=16)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int, json_sidecar: bool = False) -> Dict[str, Any]:
+    # mtime_ns/size 仅参与缓存键：文件变化后自动失效
+    if json_sidecar:
+        return _load_yaml_with_json_sidecar(path, mtime_ns, size)
+    with open(path, "r", encoding="utf-8") as f:
+        return _yaml_load(f) or {}
+
+
+def read_yaml_cached(path: pathlib.Path, json_sidecar: bool = False) -> Dict[str, Any]:
+    """
+    读取并解析 YAML 文件，按 (路径, mtime, 大小) 缓存解析结果。
+    json_sidecar=True 时额外使用 <文件名>.json 旁路缓存，跨进程重启免去 YAML 解析。
+    注意：返回的 dict 为缓存共享对象，调用方不要修改。
+    """
+    st = path.stat()
+    return _load_yaml_cached(str(path.resolve()), st.st_mtime_ns, st.st_size, json_sidecar)
+
+
 def load_config(path: Optional[str] = None) -> AppConfig:
     """
     从 YAML 加载配置。
@@ -105,8 +188,7 @@ def load_config(path: Optional[str] = None) -> AppConfig:
     if not cfg_path.exists():
         raise ConfigError(f"配置文件未找到: {cfg_path}")
 
-    with cfg_path.open("r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f) or {}
+    raw = read_yaml_cached(cfg_path, json_sidecar=True)
 
     ob_raw: Dict[str, Any] = raw.get("onebot", {}) or {}
     bot_raw: Dict[str, Any] = raw.get("bot", {}) or {}
@@ -121,6 +203,7 @@ def load_config(path: Optional[str] = None) -> AppConfig:
         connect_timeout=_ensure_int(ob_raw.get("connect_timeout"), 10),
         reconnect_interval=_ensure_int(ob_raw.get("reconnect_interval"), 3),
         use_query_token=_ensure_bool(ob_raw.get("use_query_token"), False),
+        compression=_ensure_compression(ob_raw.get("compression")),
     )
 
     bot = BotConfig(
@@ -156,9 +239,11 @@ def build_ws_connect_params(ob: OneBotConfig) -> Tuple[str, Dict[str, str]]:
 
 def _append_query(url: str, extra_params: Dict[str, str]) -> str:
     """为 url 附加/合并 query 参数"""
-    parsed = urlparse(url)
-    original_qs = dict(parse_qsl(parsed.query, keep_blank_values=True))
-    original_qs.update({k: v for k, v in extra_params.items() if v is not None})
-    new_query = urlencode(original_qs)
+    parsed = urlsplit(url)
+    extra = {k: v for k, v in extra_params.items() if v is not None}
+    # 直接用 (k, v) 序列交给 urlencode：保留原有参数顺序，被覆盖的键移除后追加到末尾
+    pairs = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k not in extra]
+    pairs.extend(extra.items())
+    new_query = urlencode(pairs)
     new_parsed = parsed._replace(query=new_query)
-    return urlunparse(new_parsed)
+    return urlunsplit(new_parsed)
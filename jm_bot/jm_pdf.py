@@ -12,8 +12,9 @@ JM 漫画下载与转 PDF 兼容模块（独立文件，内置漫画获取）
   - jmcomic            （漫画下载）
   - pillow (PIL)       （图像处理与保存 PDF）
   - pyyaml             （解析 YAML 配置）
+  - img2pdf            （可选：JPEG 无损直接嵌入 PDF，免解码/重编码）
 安装示例：
-  pip install jmcomic pillow pyyaml
+  pip install jmcomic pillow pyyaml img2pdf
 
 注意：
 - 本模块不依赖 OneBot，供主逻辑调用。
@@ -22,18 +23,42 @@ JM 漫画下载与转 PDF 兼容模块（独立文件，内置漫画获取）
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import functools
+import hashlib
+import itertools
+import json
 import os
 import time
 import pathlib
-import yaml
 
-from PIL import Image
+from .config import read_yaml_cached
 
-try:
-    import jmcomic  # type: ignore
-except Exception:  # pragma: no cover
-    jmcomic = None  # 允许环境未安装 jmcomic 时仅使用 PDF 转换能力
+if TYPE_CHECKING:  # pragma: no cover
+    from PIL import Image
+
+# Pillow / jmcomic / img2pdf 均在首次使用时才导入，避免拖慢仅需配置或消息功能的进程启动
+
+
+@functools.lru_cache(maxsize=None)
+def _jmcomic() -> Any:
+    """延迟导入 jmcomic；未安装时返回 None（允许仅使用 PDF 转换能力）。"""
+    try:
+        import jmcomic  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return jmcomic
+
+
+@functools.lru_cache(maxsize=None)
+def _img2pdf() -> Any:
+    """延迟导入 img2pdf；未安装时返回 None（统一走 Pillow 转换）。"""
+    try:
+        import img2pdf  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return img2pdf
 
 
 # -------------------------
@@ -82,8 +107,7 @@ def load_jmcomic_yaml_config(path: str) -> JMComicConfig:
     if not cfg_path.exists():
         raise FileNotFoundError(f"JM 配置文件不存在：{cfg_path}")
 
-    with cfg_path.open("r", encoding="utf-8") as f:
-        raw = yaml.safe_load(f) or {}
+    raw = read_yaml_cached(cfg_path)
 
     dir_rule = (raw.get("dir_rule") or {})
     download = (raw.get("download") or {})
@@ -110,6 +134,7 @@ def build_jm_option_from_yaml(path: str):
     基于 YAML 路径构造 jmcomic 的 JmOption。
     若未安装 jmcomic，则返回 None。
     """
+    jmcomic = _jmcomic()
     if jmcomic is None:
         return None
     # jmcomic 官方推荐的从文件加载方式
@@ -124,6 +149,7 @@ def download_albums(album_ids: Sequence[str], jm_option: Any) -> None:
     使用 jmcomic 下载多个本子/专辑。
     jm_option 建议使用 build_jm_option_from_yaml() 构造。
     """
+    jmcomic = _jmcomic()
     if jmcomic is None:
         raise RuntimeError("未安装 jmcomic，无法执行下载。请先 pip install jmcomic")
     if not album_ids:
@@ -135,49 +161,159 @@ def download_albums(album_ids: Sequence[str], jm_option: Any) -> None:
 # -------------------------
 # PDF 合成
 # -------------------------
-_IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+# 扩展名不含点、均为小写
+_IMAGE_EXTS = frozenset({"jpg", "jpeg", "png", "webp", "bmp"})
+_JPEG_EXTS = frozenset({"jpg", "jpeg"})
+# 每批写入 PDF 的页数（越大越快，但占用内存越多）
+PDF_PAGE_BATCH = 32
+# 预解码图片的线程数
+PDF_DECODE_WORKERS = 4
+# base_dir 下记录已转换本子的清单文件（用于批量转换时跳过未变化的本子）
+MANIFEST_NAME = ".jm_pdf_manifest.json"
+
+
+def _ext_of(name: str) -> str:
+    """返回小写扩展名（不含点）；无扩展名时返回空串。"""
+    _, dot, ext = name.rpartition(".")
+    return ext.lower() if dot else ""
 
 
 def _list_numeric_subdirs(root: pathlib.Path) -> List[pathlib.Path]:
     """
     返回 root 下按名称转 int 排序的子目录列表（仅数值名）。
+    使用 os.scandir：DirEntry 的 is_dir/is_file 复用目录读取结果，避免逐项 stat。
     """
-    items: List[Tuple[int, pathlib.Path]] = []
-    if not root.exists():
+    items: List[Tuple[int, str]] = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                try:
+                    items.append((int(entry.name), entry.path))
+                except ValueError:
+                    # 忽略非纯数字目录
+                    continue
+    except FileNotFoundError:
         return []
-    for entry in root.iterdir():
-        if entry.is_dir():
-            try:
-                idx = int(entry.name)
-                items.append((idx, entry))
-            except Exception:
-                # 忽略非纯数字目录
-                continue
     items.sort(key=lambda x: x[0])
-    return [p for _, p in items]
+    return [pathlib.Path(p) for _, p in items]
+
+
+def _page_sort_key(name: str) -> Tuple[int, str]:
+    """纯数字文件名按数值排序，其余排在其后并按名称排序。"""
+    stem = name.rpartition(".")[0]
+    return (int(stem) if stem.isdigit() else 1 << 62, name)
 
 
 def _list_images_in_dir(d: pathlib.Path) -> List[pathlib.Path]:
-    files: List[pathlib.Path] = []
-    if not d.exists():
-        return files
-    for entry in d.iterdir():
-        if entry.is_file():
-            if entry.suffix.lower() in _IMAGE_EXTS:
-                files.append(entry)
-    # 按文件名自然排序
-    files.sort(key=lambda p: p.name)
-    return files
+    names: List[str] = []
+    try:
+        with os.scandir(d) as it:
+            for entry in it:
+                if entry.is_file() and _ext_of(entry.name) in _IMAGE_EXTS:
+                    names.append(entry.name)
+    except FileNotFoundError:
+        return []
+    # 按文件名自然排序（2.jpg 在 10.jpg 之前）
+    names.sort(key=_page_sort_key)
+    return [d / name for name in names]
+
+
+def _iter_album_images(album_dir: pathlib.Path) -> Iterator[pathlib.Path]:
+    """
+    按章节顺序逐个产出本子的图片路径。
+    章节已按序号排序、章节内图片已排序，直接串联即为全局顺序，无需再整体排序；
+    章节目录按需逐个扫描。
+    """
+    chapter_dirs = _list_numeric_subdirs(album_dir)
+    if not chapter_dirs:
+        # 兼容：若没有数字子目录，尝试直接把当前目录下图片合并
+        chapter_dirs = [album_dir]
+    return itertools.chain.from_iterable(map(_list_images_in_dir, chapter_dirs))
+
+
+def _collect_album_images(album_dir: pathlib.Path) -> List[pathlib.Path]:
+    """按章节顺序收集本子的全部图片路径。"""
+    return list(_iter_album_images(album_dir))
 
 
 def _open_image_rgb(path: pathlib.Path) -> Image.Image:
+    from PIL import Image
+
     img = Image.open(str(path))
     # 有些格式是 RGBA/P 等，统一转 RGB 便于保存 PDF
     if img.mode != "RGB":
-        img = img.convert("RGB")
+        rgb = img.convert("RGB")
+        img.close()
+        img = rgb
+    return img
+
+
+def _load_page(path: pathlib.Path) -> Image.Image:
+    img = _open_image_rgb(path)
+    # 在工作线程中完成解码（Pillow 解码时会释放 GIL）
+    img.load()
     return img
 
 
+def _write_pdf_pages(
+    images: List[pathlib.Path],
+    pdf_file: pathlib.Path,
+    batch: int = PDF_PAGE_BATCH,
+    workers: int = PDF_DECODE_WORKERS,
+) -> None:
+    """
+    分批将图片写入 PDF：每批最多打开 batch 张图片，写完立即关闭。
+    Pillow 单次 save 会先收集全部 append_images 再写出，无法流式；
+    这里第一批新建文件，后续批次以 append=True 追加，峰值内存只与批大小相关。
+    写入当前批次的同时，线程池预先解码下一批（同一时刻最多两批在内存中）。
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        def prefetch(start: int) -> List[Future]:
+            return [pool.submit(_load_page, p) for p in images[start:start + batch]]
+
+        pending = prefetch(0)
+        for start in range(0, len(images), batch):
+            futures = pending
+            pending = prefetch(start + batch)
+            pages: List[Image.Image] = []
+            try:
+                for fut in futures:
+                    pages.append(fut.result())
+                pages[0].save(str(pdf_file), "PDF", save_all=True, append_images=pages[1:], append=start > 0)
+            finally:
+                for im in pages:
+                    im.close()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _write_pdf_jpeg_passthrough(images: List[pathlib.Path], pdf_file: pathlib.Path) -> bool:
+    """
+    若已安装 img2pdf 且全部为 JPEG，直接将 JPEG 数据嵌入 PDF（DCTDecode），
+    不解码、不重编码，画质无损。返回 False 表示需回退到 Pillow 转换。
+    页面按固定 72 dpi 排版（1 像素 = 1pt），与 Pillow 回退路径的页面尺寸一致。
+    """
+    img2pdf = _img2pdf()
+    if img2pdf is None:
+        return False
+    if any(_ext_of(p.name) not in _JPEG_EXTS for p in images):
+        return False
+    try:
+        with open(pdf_file, "wb") as f:
+            img2pdf.convert(
+                [str(p) for p in images],
+                outputstream=f,
+                layout_fun=img2pdf.get_fixed_dpi_layout_fun((72, 72)),
+            )
+        return True
+    except Exception as e:
+        print(f"[Warn] img2pdf 转换失败，回退到 Pillow：{e!r}")
+        return False
+
+
 def convert_album_dir_to_pdf(input_folder: str, output_dir: str, pdf_name: Optional[str] = None) -> str:
     """
     将一个漫画目录转换为单个 PDF。
@@ -193,26 +329,27 @@ def convert_album_dir_to_pdf(input_folder: str, output_dir: str, pdf_name: Optio
     if not in_dir.exists():
         raise FileNotFoundError(f"输入目录不存在：{in_dir}")
 
-    chapter_dirs = _list_numeric_subdirs(in_dir)
-    if not chapter_dirs:
-        # 兼容：若没有数字子目录，尝试直接把当前目录下图片合并
-        chapter_dirs = [in_dir]
+    images = _collect_album_images(in_dir)
+    return _write_album_pdf(in_dir, images, output_dir, pdf_name, start)
 
-    images: List[pathlib.Path] = []
-    for ch in chapter_dirs:
-        images.extend(_list_images_in_dir(ch))
 
+def _write_album_pdf(
+    in_dir: pathlib.Path,
+    images: List[pathlib.Path],
+    output_dir: str,
+    pdf_name: Optional[str],
+    start: float,
+) -> str:
     if not images:
         raise ValueError(f"未找到可用图片：{in_dir}")
 
-    head = _open_image_rgb(images[0])
-    rest = [_open_image_rgb(p) for p in images[1:]]
-
     out_dir = pathlib.Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    pdf_file = out_dir / ((pdf_name or in_dir.name) + ("" if (pdf_name or in_dir.name).lower().endswith(".pdf") else ".pdf"))
-    head.save(str(pdf_file), "PDF", save_all=True, append_images=rest)
+    stem = pdf_name or in_dir.name
+    pdf_file = out_dir / (stem if stem[-4:].lower() == ".pdf" else f"{stem}.pdf")
+    if not _write_pdf_jpeg_passthrough(images, pdf_file):
+        _write_pdf_pages(images, pdf_file)
 
     dur = time.time() - start
     print(f"[PDF] 生成完成：{pdf_file} （{dur:.2f}s）")
@@ -227,30 +364,121 @@ def all2PDF(input_folder: str, pdfpath: str, pdfname: Optional[str] = None) -> s
     return convert_album_dir_to_pdf(input_folder, pdfpath, pdfname)
 
 
-def convert_all_albums_to_pdf(base_dir: str, skip_existing: bool = True) -> List[str]:
+def _album_fingerprint(album_dir: pathlib.Path, images: Optional[Iterable[pathlib.Path]] = None) -> Dict[str, Any]:
+    """
+    本子图片列表的廉价指纹：章节内相对路径拼接后的 blake2b 摘要与图片数量。
+    已收集过图片列表时可传入 images，避免再次扫描目录。
+    """
+    h = hashlib.blake2b(digest_size=16)
+    count = 0
+    for p in (_iter_album_images(album_dir) if images is None else images):
+        h.update(p.relative_to(album_dir).as_posix().encode("utf-8"))
+        h.update(b"\0")
+        count += 1
+    return {"fingerprint": h.hexdigest(), "nimages": count}
+
+
+def _load_manifest(base: pathlib.Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        data = json.loads((base / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"[Warn] 读取转换清单失败：{e!r}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_manifest(base: pathlib.Path, manifest: Dict[str, Dict[str, Any]]) -> None:
+    p = base / MANIFEST_NAME
+    tmp = p.with_suffix(".json.tmp")
+    try:
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(p)
+    except Exception as e:
+        print(f"[Warn] 保存转换清单失败：{e!r}")
+
+
+def _convert_album_safe(input_folder: str, output_dir: str, pdf_name: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    供进程池调用：返回 (PDF 路径, 图片列表指纹)，转换失败时打印警告并返回 None。
+    指纹由转换时收集的同一份图片列表计算，目录只扫描一次。
+    """
+    try:
+        start = time.time()
+        in_dir = pathlib.Path(input_folder)
+        if not in_dir.exists():
+            raise FileNotFoundError(f"输入目录不存在：{in_dir}")
+        images = _collect_album_images(in_dir)
+        pdf_path = _write_album_pdf(in_dir, images, output_dir, pdf_name, start)
+        return pdf_path, _album_fingerprint(in_dir, images)
+    except Exception as e:
+        print(f"[Warn] 转换失败：{input_folder} -> {e!r}")
+        return None
+
+
+def convert_all_albums_to_pdf(base_dir: str, skip_existing: bool = True, max_workers: Optional[int] = None) -> List[str]:
     """
     扫描 base_dir 下的每个子目录，将其各自合成 PDF。
-    默认跳过已经存在的同名 PDF。
+    默认跳过已转换的本子：清单（MANIFEST_NAME）中有记录、PDF 仍存在且图片列表未变化的直接跳过；
+    清单中无记录的，沿用“已存在同名 PDF 则跳过”的规则；PDF 已被删除的一律重新转换。
+    各本子相互独立，使用进程池并行转换（max_workers 默认取 CPU 核数）。
     返回所有生成的 PDF 路径列表（跳过的不返回）。
     """
     base = pathlib.Path(base_dir)
     if not base.exists():
         raise FileNotFoundError(f"base_dir 不存在：{base}")
-    out_list: List[str] = []
-
-    for entry in base.iterdir():
-        if not entry.is_dir():
-            continue
-        target_pdf = base / (entry.name + ".pdf")
-        if skip_existing and target_pdf.exists():
-            print(f"[Skip] 已存在：{target_pdf}")
-            continue
-        try:
-            pdf_path = convert_album_dir_to_pdf(str(entry), str(base), entry.name)
-            out_list.append(pdf_path)
-        except Exception as e:
-            print(f"[Warn] 转换失败：{entry} -> {e!r}")
-    return out_list
+
+    manifest = _load_manifest(base)
+    tasks: List[Tuple[str, str, str]] = []
+    # 一次 scandir 同时得到本子目录与已存在的 PDF 文件名，免去逐个 exists() 检查
+    album_dirs: List[pathlib.Path] = []
+    existing_pdfs = set()
+    with os.scandir(base) as it:
+        for e in it:
+            if e.is_dir():
+                album_dirs.append(pathlib.Path(e.path))
+            elif e.name.endswith(".pdf") and e.is_file():
+                existing_pdfs.add(e.name)
+
+    for entry in album_dirs:
+        pdf_exists = f"{entry.name}.pdf" in existing_pdfs
+        if skip_existing and pdf_exists:
+            recorded = manifest.get(entry.name)
+            if recorded is None:
+                print(f"[Skip] 已存在：{base / (entry.name + '.pdf')}")
+                continue
+            # 清单中有记录：图片列表未变化则跳过，否则视为过期重新转换（仅此时需要计算指纹）
+            fp = _album_fingerprint(entry)
+            if recorded.get("fingerprint") == fp["fingerprint"] and recorded.get("nimages") == fp["nimages"]:
+                print(f"[Skip] 未变化：{entry}")
+                continue
+        tasks.append((str(entry), str(base), entry.name))
+
+    # 清理已不存在的本子目录对应的记录
+    album_names = {entry.name for entry in album_dirs}
+    stale = [name for name in manifest if name not in album_names]
+    for name in stale:
+        del manifest[name]
+    changed = bool(stale)
+
+    pdfs: List[str] = []
+    if tasks:
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_convert_album_safe, *t) for t in tasks]
+            results = [fut.result() for fut in futures]
+
+        for (_, _, name), result in zip(tasks, results):
+            if result:
+                pdf_path, fp = result
+                manifest[name] = {"pdf": pdf_path, **fp}
+                pdfs.append(pdf_path)
+                changed = True
+    # 仅在清单有变化时写回
+    if changed:
+        _save_manifest(base, manifest)
+    return pdfs
 
 
 # -------------------------
@@ -276,7 +504,7 @@ def _demo_main() -> None:
     print(f"[INFO] cache={cfg.cache} decode={cfg.image_decode} suffix={cfg.image_suffix} batch={cfg.batch_count}")
 
     # 如需下载，请取消注释以下代码，并填写 album_ids
-    # if jmcomic is not None:
+    # if _jmcomic() is not None:
     #     jm_opt = build_jm_option_from_yaml(default_yaml)
     #     download_albums(['146417'], jm_opt)
 
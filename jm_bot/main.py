@@ -3,20 +3,18 @@ from __future__ import annotations
 import asyncio
 import re
 import os
-import json
 import random
 import string
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import pathlib
-import yaml
 import time
 import shutil
 import traceback
 from concurrent.futures import ProcessPoolExecutor
 
 # OneBot 客户端与工具
-from .onebot_ws import OneBotWSClient, message_array_to_plain, log_info, log_warn, log_err
-from .config import load_config, AppConfig
+from .onebot_ws import OneBotWSClient, message_array_to_plain, run_with_fast_loop, json_dumps, json_loads, log_info, log_warn, log_err
+from .config import load_config, read_yaml_cached, AppConfig
 from . import message as MSG
 
 # 引入 PDF 工具（使用你迁移过来的 jm_bot/jm_pdf/main.py）
@@ -25,13 +23,22 @@ from . import message as MSG
 
 
 # -------- 命令解析 --------
-# 支持可选的命令前缀（如 /jm、!jm、.jm、#jm），以及两端空白
-# 使用 ^ 确保命令必须在消息开头（忽略前导空白）
-CMD_JM = re.compile(r"^\s*[/.!#]?\s*jm\s+(\d+)\b", re.IGNORECASE)
-CMD_ENABLE = re.compile(r"^\s*[/.!#]?\s*开启jm\s*$", re.IGNORECASE)
-CMD_DISABLE = re.compile(r"^\s*[/.!#]?\s*关闭jm\s*$", re.IGNORECASE)
-CMD_HELP = re.compile(r"^\s*[/.!#]?\s*帮助\s*$", re.IGNORECASE)
-CMD_UPDATE = re.compile(r"^\s*[/.!#]?\s*更新jm\s*$", re.IGNORECASE)
+# 支持可选的命令前缀（如 /jm、!jm、.jm、#jm）；两端空白在匹配前已统一 strip
+# 使用 match 确保命令必须在消息开头
+# 所有命令合并为一个正则，匹配一次后按 lastgroup 分派
+# re.ASCII：命令中的 \s/\d/\b 只需识别 ASCII 字符，中文字面量不受影响
+CMD_ALL = re.compile(
+    r"[/.!#]?\s*(?:"
+    r"(?P<enable>开启jm)$"
+    r"|(?P<disable>关闭jm)$"
+    r"|(?P<help>帮助)$"
+    r"|(?P<update>更新jm)$"
+    r"|jm\s+(?P<jm>\d+)\b"
+    r")",
+    re.IGNORECASE | re.ASCII,
+)
+# 命令可能的首字符：绝大多数普通聊天消息可据此直接跳过正则匹配
+CMD_FIRST_CHARS = frozenset("/.!#jJ开关帮更")
 
 # 预览页数量
 PREVIEW_IMAGE_COUNT = 3
@@ -39,16 +46,26 @@ WORK_ROOT = "jm_bot/.work"
 CLEANUP_AFTER_SEND = True
 
 # 分群冷却状态（内存）
+# 值为 time.monotonic() 时间戳，不受系统时钟调整影响
 GROUP_COOLDOWN_NEXT_TS: Dict[int, float] = {}
-GROUP_COOLDOWN_LOCKS: Dict[int, asyncio.Lock] = {}
-# 标记某个群是否正在处理请求（避免在处理期间被再次触发）
-GROUP_BUSY: Dict[int, bool] = {}
+# 每个群一把锁，锁被占用表示该群正在处理请求（避免在处理期间被再次触发）
+# 锁在首次使用时（事件循环内）创建
+GROUP_LOCKS: Dict[int, asyncio.Lock] = {}
 
 # 群开关持久化（默认关闭）
 STATE_FILE = "jm_bot/group_state.json"
 GROUP_ENABLED: Dict[int, bool] = {}
 # 在模块导入时不要创建 asyncio.Lock(), 需要在运行时绑定到事件循环
 STATE_LOCK: Optional[asyncio.Lock] = None
+# 群开关延迟保存（合并短时间内的多次修改）
+STATE_SAVE_DELAY = 1.0
+STATE_SAVE_TASK: Optional[asyncio.Task] = None
+
+# 启动时后台删除旧临时目录的任务（保持引用，避免被回收）
+STARTUP_CLEANUP_TASK: Optional[asyncio.Task] = None
+
+# 机器人自身 QQ 号缓存（重连时清空）
+SELF_ID_CACHE: Optional[int] = None
 
 # 进程池（用于将下载与PDF转换放到独立进程，避免阻塞主进程/GIL 影响）
 PROCESS_POOL: Optional[ProcessPoolExecutor] = None
@@ -58,12 +75,46 @@ def _get_process_pool() -> ProcessPoolExecutor:
     if PROCESS_POOL is None:
         # 单工作进程即可，避免并发下载造成风控；如需并行可调大
         PROCESS_POOL = ProcessPoolExecutor(max_workers=1)
+        # 预热：让常驻工作进程提前导入 jmcomic 与 PDF 工具，首个 /jm 命令无需等待
+        PROCESS_POOL.submit(_proc_warmup)
     return PROCESS_POOL
 
+async def _submit_to_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    将任务提交到进程池并等待结果。
+    任务在子进程执行，contextvars 无法传递，因此直接 submit + wrap_future，
+    不做上下文复制或 partial 包装。
+    """
+    return await asyncio.wrap_future(_get_process_pool().submit(fn, *args))
+
 # 供子进程执行的纯函数（必须顶层定义以便可pickle）
-def _proc_download_album(album_id: str, jm_yaml_path: str) -> None:
+
+# 子进程内缓存：(源 YAML 绝对路径, mtime) -> JmOption，避免每次下载都重新解析配置
+_JM_OPTION_CACHE: Dict[Tuple[str, int], Any] = {}
+
+def _proc_warmup() -> None:
+    try:
+        import jmcomic  # noqa: F401
+        import jm_bot.jm_pdf  # noqa: F401
+    except Exception:
+        # 预热失败不影响后续任务（届时会再次导入并报告真实错误）
+        pass
+
+def _proc_get_jm_option(jm_yaml_path: str) -> Any:
     import jmcomic
-    jm_opt = jmcomic.JmOption.from_file(jm_yaml_path)
+    key = (os.path.abspath(jm_yaml_path), os.stat(jm_yaml_path).st_mtime_ns)
+    opt = _JM_OPTION_CACHE.get(key)
+    if opt is None:
+        _JM_OPTION_CACHE.clear()
+        opt = jmcomic.JmOption.from_file(jm_yaml_path)
+        _JM_OPTION_CACHE[key] = opt
+    return opt
+
+def _proc_download_album(album_id: str, jm_yaml_path: str, base_dir: str) -> None:
+    import jmcomic
+    # 复制缓存的配置，仅覆盖下载目录（不再为每个请求生成临时 YAML）
+    jm_opt = _proc_get_jm_option(jm_yaml_path).copy_option()
+    jm_opt.dir_rule.base_dir = os.path.abspath(base_dir)
     jmcomic.download_album(str(album_id), jm_opt)
 
 def _generate_random_password(length: int = 6) -> str:
@@ -125,14 +176,37 @@ def _safe_rmtree(path: Optional[str]) -> None:
     except Exception as e:
         log_warn(f"删除临时目录失败：{e!r} path={path}")
 
-def _cleanup_startup_work_root() -> None:
+async def _safe_rmtree_async(path: Optional[str]) -> None:
+    """在默认线程池中执行 _safe_rmtree，避免大量 unlink 阻塞事件循环。"""
+    if not path:
+        return
+    await asyncio.get_running_loop().run_in_executor(None, _safe_rmtree, path)
+
+def _cleanup_startup_work_root() -> List[str]:
+    """
+    启动时清理临时目录：将旧目录改名移开并立即重建空目录，
+    返回待删除的旧目录列表（含此前未删完的残留），由调用方在后台删除。
+    改名是瞬时操作，新任务的工作目录不会落入正在删除的目录中。
+    """
+    root = pathlib.Path(WORK_ROOT)
     try:
-        root = pathlib.Path(WORK_ROOT)
         if root.exists():
-            shutil.rmtree(root, ignore_errors=True)
+            try:
+                root.rename(root.with_name(f"{root.name}.trash-{time.time_ns()}"))
+            except OSError:
+                # 改名失败（如目录被占用）时退回同步删除
+                shutil.rmtree(root, ignore_errors=True)
         root.mkdir(parents=True, exist_ok=True)
     except Exception as e:
         log_warn(f"启动时清理临时目录失败：{e!r}")
+    try:
+        return [str(p) for p in root.parent.glob(f"{root.name}.trash-*")]
+    except Exception:
+        return []
+
+def _remove_dirs(paths: List[str]) -> None:
+    for p in paths:
+        _safe_rmtree(p)
 
 
 def _get_plain_text_from_event_message(evt: Dict[str, Any]) -> str:
@@ -141,7 +215,7 @@ def _get_plain_text_from_event_message(evt: Dict[str, Any]) -> str:
         try:
             return message_array_to_plain(msg)
         except Exception:
-            return json.dumps(msg, ensure_ascii=False)
+            return json_dumps(msg).decode("utf-8")
     return str(msg)
 
 
@@ -164,54 +238,34 @@ async def _call_and_get_message_id(coro) -> Optional[int]:
         return None
 
 
-def _prepare_temp_yaml(jm_yaml_src_path: str, work_dir: str) -> str:
-    with open(jm_yaml_src_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-    if "dir_rule" not in data or not isinstance(data["dir_rule"], dict):
-        data["dir_rule"] = {}
-    data["dir_rule"]["base_dir"] = work_dir
-    os.makedirs(work_dir, exist_ok=True)
-    temp_yaml = os.path.join(work_dir, "config.yml")
-    with open(temp_yaml, "w", encoding="utf-8") as f:
-        yaml.safe_dump(data, f, allow_unicode=True)
-    return temp_yaml
-
-
 def _find_album_dir_in_work(work_dir: str, album_id: str) -> Optional[str]:
     """
-    在 work_dir 下查找漫画目录（优化版本，避免不必要的遍历）
+    在 work_dir 下查找漫画目录（单次 os.scandir 遍历，DirEntry 自带类型信息，无需逐项 stat）：
+      1. 优先：精确匹配 album_id
+      2. 次选：目录名包含 album_id（第一个匹配即返回）
+      3. 最后：返回第一个目录（通常 work_dir 只有一个下载的目录）
     """
-    base = pathlib.Path(work_dir)
-    if not base.exists():
-        return None
-    
-    # 1. 优先：精确匹配 album_id
-    exact = base / album_id
-    if exact.exists() and exact.is_dir():
-        return str(exact)
-    
-    # 2. 次选：目录名包含 album_id（第一个匹配即返回）
-    try:
-        for p in base.iterdir():
-            if p.is_dir() and album_id in p.name:
-                return str(p)
-    except Exception:
-        pass
-    
-    # 3. 最后：返回第一个目录（通常 work_dir 只有一个下载的目录）
+    exact = os.path.join(work_dir, album_id)
+    if os.path.isdir(exact):
+        return exact
+
+    first_dir: Optional[str] = None
     try:
-        for p in base.iterdir():
-            if p.is_dir():
-                return str(p)
-    except Exception:
-        pass
-    
-    return None
+        with os.scandir(work_dir) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                if album_id in entry.name:
+                    return entry.path
+                if first_dir is None:
+                    first_dir = entry.path
+    except OSError:
+        return None
+    return first_dir
 
 
 def _load_jm_pdf_base_dir(config_path: str = "jm_bot/jm_pdf/config.yml") -> str:
-    with open(config_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    data = read_yaml_cached(pathlib.Path(config_path))
     return str(((data.get("dir_rule") or {}).get("base_dir")) or ".")
 
 
@@ -222,45 +276,61 @@ def _find_album_dir(base_dir: str, album_id: str) -> Optional[str]:
       - 其次 目录名包含 album_id 的第一个匹配
       - 若都未找到，返回 None
     """
-    base = pathlib.Path(base_dir)
-    if not base.exists():
-        return None
-    exact = base / album_id
-    if exact.exists() and exact.is_dir():
-        return str(exact)
+    exact = os.path.join(base_dir, album_id)
+    if os.path.isdir(exact):
+        return exact
 
     # 次选：包含 album_id 的目录
-    for entry in base.iterdir():
-        if entry.is_dir() and album_id in entry.name:
-            return str(entry)
+    try:
+        with os.scandir(base_dir) as it:
+            for entry in it:
+                if entry.is_dir() and album_id in entry.name:
+                    return entry.path
+    except OSError:
+        pass
     return None
 
 
 def _list_numeric_subdirs(root: pathlib.Path) -> List[pathlib.Path]:
-    items: List[Tuple[int, pathlib.Path]] = []
-    if not root.exists():
+    items: List[Tuple[int, str]] = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                try:
+                    items.append((int(entry.name), entry.path))
+                except ValueError:
+                    continue
+    except OSError:
         return []
-    for entry in root.iterdir():
-        if entry.is_dir():
-            try:
-                idx = int(entry.name)
-                items.append((idx, entry))
-            except Exception:
-                continue
     items.sort(key=lambda x: x[0])
-    return [p for _, p in items]
+    return [pathlib.Path(p) for _, p in items]
+
+
+# 图片扩展名（不含点、小写）
+IMAGE_EXTS = frozenset({"jpg", "jpeg", "png", "webp", "bmp"})
 
 
 def _list_images_in_dir(d: pathlib.Path) -> List[pathlib.Path]:
-    IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
-    files: List[pathlib.Path] = []
-    if not d.exists():
-        return files
-    for entry in d.iterdir():
-        if entry.is_file() and entry.suffix.lower() in IMAGE_EXTS:
-            files.append(entry)
-    files.sort(key=lambda p: p.name)
-    return files
+    names: List[str] = []
+    try:
+        with os.scandir(d) as it:
+            for entry in it:
+                _, dot, ext = entry.name.rpartition(".")
+                if dot and ext.lower() in IMAGE_EXTS and entry.is_file():
+                    names.append(entry.name)
+    except OSError:
+        return []
+    names.sort()
+    return [d / name for name in names]
+
+
+def _count_album_images(album_dir: str) -> int:
+    """统计本子图片总数；若没有数字章节子目录，则把本子目录本身视为唯一章节。"""
+    root = pathlib.Path(album_dir)
+    chapters = _list_numeric_subdirs(root) or [root]
+    return sum(len(_list_images_in_dir(ch)) for ch in chapters)
 
 
 def _collect_preview_images(album_dir: str, limit: int = PREVIEW_IMAGE_COUNT) -> List[str]:
@@ -280,12 +350,38 @@ def _collect_preview_images(album_dir: str, limit: int = PREVIEW_IMAGE_COUNT) ->
     return previews
 
 
-async def _download_album_with_jmcomic(album_id: str, jm_yaml_path: str) -> None:
+async def _get_self_id(client: OneBotWSClient) -> Optional[int]:
+    """
+    获取机器人自身 QQ 号。会话期间不会变化，首次调用 get_login_info 后缓存；
+    重新连接时由 _install_event_handler 注册的 on_connect 回调清空缓存。
+    """
+    global SELF_ID_CACHE
+    if SELF_ID_CACHE is not None:
+        return SELF_ID_CACHE
+    try:
+        info = await client.call_api("get_login_info", {})
+        self_id = info.get("data", {}).get("user_id")
+        if isinstance(self_id, str) and self_id.isdigit():
+            self_id = int(self_id)
+    except Exception as e:
+        log_warn(f"获取登录信息失败：{e!r}")
+        return None
+    if isinstance(self_id, int) and self_id:
+        SELF_ID_CACHE = self_id
+        return self_id
+    return None
+
+
+def _reset_self_id_cache() -> None:
+    global SELF_ID_CACHE
+    SELF_ID_CACHE = None
+
+
+async def _download_album_with_jmcomic(album_id: str, jm_yaml_path: str, base_dir: str) -> None:
     """
     使用独立进程执行 jmcomic 下载，彻底避免阻塞主进程事件循环。
     """
-    loop = asyncio.get_running_loop()
-    await loop.run_in_executor(_get_process_pool(), _proc_download_album, album_id, jm_yaml_path)
+    await _submit_to_pool(_proc_download_album, album_id, jm_yaml_path, base_dir)
 
 
 async def handle_jm_command(client: OneBotWSClient, cfg: AppConfig, group_id: int, album_id: str) -> None:
@@ -297,39 +393,31 @@ async def handle_jm_command(client: OneBotWSClient, cfg: AppConfig, group_id: in
     await _call_and_get_message_id(client.send_group_message(group_id, [MSG.text(f"开始处理 jm {album_id}，请稍候……")]))
 
     # 获取机器人自身账号（用于给自己发）
-    self_id: Optional[int] = None
-    try:
-        info = await client.call_api("get_login_info", {})
-        self_id = info.get("data", {}).get("user_id")
-        if isinstance(self_id, str) and self_id.isdigit():
-            self_id = int(self_id)
-    except Exception as e:
-        log_warn(f"获取登录信息失败：{e!r}")
+    self_id = await _get_self_id(client)
 
     if not self_id:
         await _call_and_get_message_id(client.send_group_message(group_id, [MSG.text("发送失败")]))
         tb = "无法获取机器人自身QQ号（get_login_info 返回空或异常）"
         await _notify_admins(client, cfg, f"[处理异常] group={group_id}\n{tb}")
         if CLEANUP_AFTER_SEND:
-            _safe_rmtree(work_dir)
+            await _safe_rmtree_async(work_dir)
         return
 
     # 2) 下载与 PDF 合成
     jm_yaml_src = "jm_bot/jm_pdf/config.yml"
     work_dir = os.path.join(WORK_ROOT, f"{album_id}-{int(time.time())}")
     os.makedirs(work_dir, exist_ok=True)
-    temp_yaml = _prepare_temp_yaml(jm_yaml_src, work_dir)
     base_dir = work_dir
 
     # 下载
     try:
-        await _download_album_with_jmcomic(album_id, temp_yaml)
-    except Exception as e:
+        await _download_album_with_jmcomic(album_id, jm_yaml_src, base_dir)
+    except Exception:
         await _call_and_get_message_id(client.send_group_message(group_id, [MSG.text("发送失败")]))
-        tb = "".join(traceback.format_exception(type(e), e, e.__traceback__))
-        await _notify_admins(client, cfg, f"[下载失败] group={group_id} album={album_id}\n{tb}")
+        if _has_admins(cfg):
+            await _notify_admins(client, cfg, f"[下载失败] group={group_id} album={album_id}\n{traceback.format_exc()}")
         if CLEANUP_AFTER_SEND:
-            _safe_rmtree(work_dir)
+            await _safe_rmtree_async(work_dir)
         return
 
     # 定位本地目录
@@ -338,14 +426,13 @@ async def handle_jm_command(client: OneBotWSClient, cfg: AppConfig, group_id: in
         await _call_and_get_message_id(client.send_group_message(group_id, [MSG.text("发送失败")]))
         await _notify_admins(client, cfg, f"[定位目录失败] group={group_id} album={album_id} work_dir={work_dir}")
         if CLEANUP_AFTER_SEND:
-            _safe_rmtree(work_dir)
+            await _safe_rmtree_async(work_dir)
         return
 
     # PDF 合成（使用你迁移过来的 all2PDF）
     pdf_path: Optional[str] = None
     try:
-        loop = asyncio.get_running_loop()
-        pdf_path = await loop.run_in_executor(_get_process_pool(), _proc_all2pdf, album_dir, base_dir, os.path.basename(album_dir))
+        pdf_path = await _submit_to_pool(_proc_all2pdf, album_dir, base_dir, os.path.basename(album_dir))
     except Exception as e:
         log_warn(f"PDF 合成失败（继续流程，仅发送图片与文本）：{e!r}")
 
@@ -354,8 +441,7 @@ async def handle_jm_command(client: OneBotWSClient, cfg: AppConfig, group_id: in
     zip_password: Optional[str] = None
     if pdf_path and os.path.exists(pdf_path):
         try:
-            loop = asyncio.get_running_loop()
-            zip_path, zip_password = await loop.run_in_executor(_get_process_pool(), _proc_create_encrypted_zip, pdf_path, base_dir)
+            zip_path, zip_password = await _submit_to_pool(_proc_create_encrypted_zip, pdf_path, base_dir)
             log_info(f"压缩包已创建：{zip_path}, 密码：{zip_password}")
         except Exception as e:
             log_warn(f"创建加密压缩包失败：{e!r}")
@@ -383,44 +469,39 @@ async def handle_jm_command(client: OneBotWSClient, cfg: AppConfig, group_id: in
         except Exception as e:
             # 其他异常才认为是失败
             log_warn(f"upload_group_file 失败：{e!r}")
-            last_exc_tb = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+            if _has_admins(cfg):
+                last_exc_tb = traceback.format_exc()
             ok = False
     else:
         log_warn("未生成文件，无法发送到群")
 
-    # 发送详细信息到群（只有在成功发送 ZIP 压缩包时才发送详情）
-    if ok and zip_path and zip_password:
-        try:
-            # 统计图片总数作为参考
-            total_images = 0
-            root = pathlib.Path(album_dir)
-            chapters = _list_numeric_subdirs(root)
-            if not chapters:
-                chapters = [root]
-            for ch in chapters:
-                total_images += len(_list_images_in_dir(ch))
-
-            # 获取漫画名字（从目录名提取）
-            comic_name = os.path.basename(album_dir)
-            
-            info_text = (
-                f"📚 漫画：{comic_name}\n"
-                f"漫画 ID: {album_id}\n"
-                f"图片数量：{total_images}\n"
-                f"压缩包：{os.path.basename(zip_path)}\n"
-                f"解压密码：{zip_password}"
-            )
-            await _call_and_get_message_id(client.send_group_message(group_id, [MSG.text(info_text)]))
-        except Exception as e:
-            log_warn(f"发送信息到群失败：{e!r}")
-
     if ok:
-        await _call_and_get_message_id(client.send_group_message(group_id, [MSG.text(f"已完成 jm {album_id} 的发送。")]))
+        # 详情与完成提示合并为一条消息发送（只有在成功发送 ZIP 压缩包时才附带详情）
+        status_lines: List[str] = []
+        if zip_path and zip_password:
+            try:
+                # 统计图片总数作为参考
+                total_images = _count_album_images(album_dir)
+
+                # 获取漫画名字（从目录名提取）
+                comic_name = os.path.basename(album_dir)
+
+                status_lines += [
+                    f"📚 漫画：{comic_name}",
+                    f"漫画 ID: {album_id}",
+                    f"图片数量：{total_images}",
+                    f"压缩包：{os.path.basename(zip_path)}",
+                    f"解压密码：{zip_password}",
+                ]
+            except Exception as e:
+                log_warn(f"生成详情信息失败：{e!r}")
+        status_lines.append(f"已完成 jm {album_id} 的发送。")
+        await _call_and_get_message_id(client.send_group_message(group_id, [MSG.text("\n".join(status_lines))]))
     else:
         await _call_and_get_message_id(client.send_group_message(group_id, [MSG.text("发送失败")]))
         await _notify_admins(client, cfg, f"[群发送失败] group={group_id} album={album_id}\n{last_exc_tb or '(无异常堆栈)'}")
     if CLEANUP_AFTER_SEND:
-        _safe_rmtree(work_dir)
+        await _safe_rmtree_async(work_dir)
 
 # 工具：管理员判断与群开关持久化
 def _is_admin(cfg: AppConfig, user_id: Any) -> bool:
@@ -435,7 +516,7 @@ def _load_group_state() -> None:
         p = pathlib.Path(STATE_FILE)
         if not p.exists():
             return
-        data = json.loads(p.read_text(encoding="utf-8"))
+        data = json_loads(p.read_bytes())
         if isinstance(data, dict):
             GROUP_ENABLED.clear()
             for k, v in data.items():
@@ -447,20 +528,46 @@ def _load_group_state() -> None:
     except Exception as e:
         log_warn(f"加载群开关状态失败：{e!r}")
 
+def _dump_group_state() -> bytes:
+    return json_dumps({str(k): bool(v) for k, v in GROUP_ENABLED.items()}, indent=True)
+
+def _write_state_sync(path: pathlib.Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_bytes(content)
+    tmp.replace(path)
+
 async def _save_group_state() -> None:
     try:
         p = pathlib.Path(STATE_FILE)
-        p.parent.mkdir(parents=True, exist_ok=True)
-        tmp = p.with_suffix(".json.tmp")
         # STATE_LOCK 可能在模块导入时未初始化，需要动态创建
         global STATE_LOCK
         if STATE_LOCK is None:
             STATE_LOCK = asyncio.Lock()
         async with STATE_LOCK:
-            content = json.dumps({str(k): bool(v) for k, v in GROUP_ENABLED.items()}, ensure_ascii=False, indent=2)
-            # 使用同步写入（快速）即可
-            tmp.write_text(content, encoding="utf-8")
-            tmp.replace(p)
+            content = _dump_group_state()
+            # 磁盘写入放到线程池，避免阻塞事件循环
+            await asyncio.get_running_loop().run_in_executor(None, _write_state_sync, p, content)
+    except Exception as e:
+        log_warn(f"保存群开关状态失败：{e!r}")
+
+async def _save_group_state_later() -> None:
+    global STATE_SAVE_TASK
+    try:
+        await asyncio.sleep(STATE_SAVE_DELAY)
+    finally:
+        STATE_SAVE_TASK = None
+    await _save_group_state()
+
+def _flush_group_state_sync() -> None:
+    """退出前同步落盘尚未写入的群开关状态。"""
+    global STATE_SAVE_TASK
+    if STATE_SAVE_TASK is None:
+        return
+    STATE_SAVE_TASK.cancel()
+    STATE_SAVE_TASK = None
+    try:
+        _write_state_sync(pathlib.Path(STATE_FILE), _dump_group_state())
     except Exception as e:
         log_warn(f"保存群开关状态失败：{e!r}")
 
@@ -468,8 +575,17 @@ def is_group_enabled(group_id: int) -> bool:
     return GROUP_ENABLED.get(int(group_id), False)
 
 async def set_group_enabled(group_id: int, enabled: bool) -> None:
+    """
+    更新群开关并延迟保存：STATE_SAVE_DELAY 秒内的多次修改合并为一次写盘。
+    """
+    global STATE_SAVE_TASK
     GROUP_ENABLED[int(group_id)] = bool(enabled)
-    await _save_group_state()
+    if STATE_SAVE_TASK is None:
+        STATE_SAVE_TASK = asyncio.create_task(_save_group_state_later())
+
+def _has_admins(cfg: AppConfig) -> bool:
+    """是否配置了管理员；未配置时无需格式化异常堆栈。"""
+    return bool(getattr(cfg.bot, "admins", None))
 
 async def _notify_admins(client: OneBotWSClient, cfg: AppConfig, text: str) -> None:
     """
@@ -527,8 +643,7 @@ async def handle_update_command(client: OneBotWSClient, cfg: AppConfig, group_id
             client.send_group_message(group_id, [MSG.text("更新超时，请稍后重试")])
         )
     except Exception as e:
-        tb = "".join(traceback.format_exception(type(e), e, e.__traceback__))
-        log_err(f"更新异常：{tb}")
+        log_err(f"更新异常：{traceback.format_exc()}")
         await _call_and_get_message_id(
             client.send_group_message(group_id, [MSG.text(f"更新异常：{str(e)[:200]}")])
         )
@@ -546,18 +661,17 @@ async def _check_group_cooldown(cfg: AppConfig, group_id: int) -> Tuple[bool, in
     seconds = int(getattr(cfg.bot, "per_group_cooldown_seconds", 0) or 0)
     if not enabled or seconds <= 0:
         return True, 0
-    gid = int(group_id)
     # 统一以 int 作为键，避免 str/int 混用导致查不到
-    lock = GROUP_COOLDOWN_LOCKS.setdefault(gid, asyncio.Lock())
-    async with lock:
-        now = time.time()
-        next_ts = GROUP_COOLDOWN_NEXT_TS.get(gid, 0.0)
-        if now < next_ts:
-            remain = int(next_ts - now + 0.999)
-            log_info(f"分群冷却：group={gid} 冷却中 剩余={remain}s")
-            return False, remain
-        # 无冷却或已到期
-        return True, 0
+    gid = int(group_id)
+    # 单线程事件循环内的字典读写无需加锁
+    now = time.monotonic()
+    next_ts = GROUP_COOLDOWN_NEXT_TS.get(gid, 0.0)
+    if now < next_ts:
+        remain = int(next_ts - now + 0.999)
+        log_info(f"分群冷却：group={gid} 冷却中 剩余={remain}s")
+        return False, remain
+    # 无冷却或已到期
+    return True, 0
 
 async def _start_group_cooldown(cfg: AppConfig, group_id: int) -> None:
     """
@@ -568,36 +682,16 @@ async def _start_group_cooldown(cfg: AppConfig, group_id: int) -> None:
     if not enabled or seconds <= 0:
         return
     gid = int(group_id)
-    lock = GROUP_COOLDOWN_LOCKS.setdefault(gid, asyncio.Lock())
-    async with lock:
-        ts = time.time() + seconds
-        GROUP_COOLDOWN_NEXT_TS[gid] = ts
-        log_info(f"启动分群冷却：group={gid} seconds={seconds} until={ts}")
+    GROUP_COOLDOWN_NEXT_TS[gid] = time.monotonic() + seconds
+    log_info(f"启动分群冷却：group={gid} seconds={seconds}")
 
 def _install_event_handler(client: OneBotWSClient, cfg: AppConfig) -> None:
-    async def on_event(evt: Dict[str, Any]) -> None:
-        if evt.get("post_type") != "message":
-            return
-        if evt.get("message_type") != "group":
-            return
-
-        group_id = evt.get("group_id")
-        if not group_id:
-            return
-
+    async def on_command(evt: Dict[str, Any], group_id: Any, m: re.Match) -> None:
         user_id = evt.get("user_id")
-        
-        # 延迟获取文本，只在需要时才处理
-        text: Optional[str] = None
-        
-        def get_text() -> str:
-            nonlocal text
-            if text is None:
-                text = _get_plain_text_from_event_message(evt)
-            return text
+        cmd = m.lastgroup
 
         # 管理开关命令（使用正则严格匹配）
-        if CMD_ENABLE.match(get_text()):
+        if cmd == "enable":
             if _is_admin(cfg, user_id):
                 await set_group_enabled(int(group_id), True)
                 await _call_and_get_message_id(
@@ -609,7 +703,7 @@ def _install_event_handler(client: OneBotWSClient, cfg: AppConfig) -> None:
                 )
             return
 
-        if CMD_DISABLE.match(get_text()):
+        if cmd == "disable":
             if _is_admin(cfg, user_id):
                 await set_group_enabled(int(group_id), False)
                 await _call_and_get_message_id(
@@ -621,7 +715,7 @@ def _install_event_handler(client: OneBotWSClient, cfg: AppConfig) -> None:
                 )
             return
 
-        if CMD_UPDATE.match(get_text()):
+        if cmd == "update":
             if _is_admin(cfg, user_id):
                 await handle_update_command(client, cfg, int(group_id))
             else:
@@ -630,7 +724,7 @@ def _install_event_handler(client: OneBotWSClient, cfg: AppConfig) -> None:
                 )
             return
 
-        if CMD_HELP.match(get_text()):
+        if cmd == "help":
             # 未开启则提示
             if not is_group_enabled(int(group_id)):
                 await _call_and_get_message_id(
@@ -650,12 +744,8 @@ def _install_event_handler(client: OneBotWSClient, cfg: AppConfig) -> None:
             )
             return
 
-        # 解析 /jm 命令（使用 match 确保命令在开头）
-        m = CMD_JM.match(get_text())
-        if not m:
-            return
-
-        album_id = m.group(1)
+        # /jm 命令
+        album_id = m.group("jm")
         log_info(f"命令触发：group={group_id} jm {album_id}")
         # 群开关检查
         if not is_group_enabled(int(group_id)):
@@ -672,29 +762,48 @@ def _install_event_handler(client: OneBotWSClient, cfg: AppConfig) -> None:
             return
         # 串行处理，避免并发下载拥塞；若群正在处理则拒绝
         gid = int(group_id)
-        if GROUP_BUSY.get(gid):
+        lock = GROUP_LOCKS.get(gid)
+        if lock is None:
+            lock = GROUP_LOCKS[gid] = asyncio.Lock()
+        if lock.locked():
             await _call_and_get_message_id(
                 client.send_group_message(gid, [MSG.text("当前已有任务在处理，请稍候再试。")])
             )
             return
-        GROUP_BUSY[gid] = True
-        try:
-            await handle_jm_command(client, cfg, gid, album_id)
-        except Exception as e:
-            log_err(f"处理命令异常：{e!r}")
-            await _call_and_get_message_id(client.send_group_message(gid, [MSG.text("发送失败")]))
-            tb = "".join(traceback.format_exception(type(e), e, e.__traceback__))
-            await _notify_admins(client, cfg, f"[处理异常] group={group_id}\n{tb}")
-        finally:
-            # 清理“正在处理”标记，并在命令执行完成后开启冷却（符合“执行后开始冷却”的需求）
-            GROUP_BUSY.pop(gid, None)
-            await _start_group_cooldown(cfg, gid)
+        # locked() 检查与 acquire 之间没有 await，不会有其他任务插入
+        async with lock:
+            try:
+                await handle_jm_command(client, cfg, gid, album_id)
+            except Exception as e:
+                log_err(f"处理命令异常：{e!r}")
+                await _call_and_get_message_id(client.send_group_message(gid, [MSG.text("发送失败")]))
+                if _has_admins(cfg):
+                    await _notify_admins(client, cfg, f"[处理异常] group={group_id}\n{traceback.format_exc()}")
+            finally:
+                # 命令执行完成后开启冷却（符合“执行后开始冷却”的需求）；锁随 async with 退出释放
+                await _start_group_cooldown(cfg, gid)
+
+    # 同步完成过滤与命令解析，仅对命中命令的群消息创建异步任务（心跳、普通聊天等不分配 Task）
+    def on_event(evt: Dict[str, Any]) -> None:
+        if evt.get("post_type") != "message":
+            return
+        if evt.get("message_type") != "group":
+            return
+
+        group_id = evt.get("group_id")
+        if not group_id:
+            return
 
-    # 将同步 on_event 包装为异步执行
-    def wrapper(evt: Dict[str, Any]) -> None:
-        asyncio.create_task(on_event(evt))
+        text = _get_plain_text_from_event_message(evt).strip()
+        if not text or text[0] not in CMD_FIRST_CHARS:
+            return
+        m = CMD_ALL.match(text)
+        if not m:
+            return
+        asyncio.create_task(on_command(evt, group_id, m))
 
-    client.on_event = wrapper
+    client.on_event = on_event
+    client.on_connect = _reset_self_id_cache
 
 
 async def _main_async() -> None:
@@ -704,12 +813,19 @@ async def _main_async() -> None:
     if STATE_LOCK is None:
         STATE_LOCK = asyncio.Lock()
     _load_group_state()
-    _cleanup_startup_work_root()
+    # 旧临时目录在后台线程删除，与首次 WS 连接并行
+    global STARTUP_CLEANUP_TASK
+    stale_dirs = _cleanup_startup_work_root()
+    if stale_dirs:
+        STARTUP_CLEANUP_TASK = asyncio.create_task(asyncio.to_thread(_remove_dirs, stale_dirs))
+    # 启动即创建进程池并预热工作进程
+    _get_process_pool()
     client = OneBotWSClient(cfg)
     _install_event_handler(client, cfg)
     try:
         await client.run_forever()
     finally:
+        _flush_group_state_sync()
         # 关闭进程池，避免子进程残留
         global PROCESS_POOL
         if PROCESS_POOL is not None:
@@ -719,6 +835,6 @@ async def _main_async() -> None:
 
 if __name__ == "__main__":
     try:
-        asyncio.run(_main_async())
+        run_with_fast_loop(_main_async())
     except KeyboardInterrupt:
         log_info("Interrupted by user")
@@ -9,6 +9,7 @@ OneBot v11 消息段（数组格式）构造工具
 from __future__ import annotations
 from typing import Dict, Any, List, Optional, Union
 import base64
+import os
 import pathlib
 import re
 
@@ -108,6 +109,7 @@ def file_segment(file: str, name: Optional[str] = None) -> MessageSegment:
     """
     Non-standard extension: generic file message segment (supported by some implementations like go-cqhttp).
     file accepts local path/URL/base64://; name sets the display name.
+    Local paths are always passed as file:/// URIs and never inlined as base64.
     """
     file_value = _normalize_file_input(file)
     data: Dict[str, Any] = {"file": file_value}
@@ -203,27 +205,46 @@ def text_and_image(content: str, image_file: str) -> Message:
 # 工具函数
 
 _windows_drive_re = re.compile(r"^[A-Za-z]:[\\/]")
+_PASSTHROUGH_PREFIXES = ("http://", "https://", "base64://", "file:///")
 
 
 def _normalize_file_input(file: str) -> str:
     """将本地路径转换为 file:/// URI；保持 http(s) 与 base64 前缀原样。"""
-    if file.startswith("http://") or file.startswith("https://") or file.startswith("base64://") or file.startswith("file:///"):
+    if file.startswith(_PASSTHROUGH_PREFIXES):
         return file
     # Windows 绝对路径或相对路径统一转换为 file URI
-    p = pathlib.Path(file).expanduser().resolve()
+    # abspath 仅做字符串层面的规范化，不像 resolve() 那样逐级访问文件系统
+    p = pathlib.Path(os.path.abspath(os.path.expanduser(file)))
     # path.as_uri() 会生成正确的 file:/// URL 并自动处理空格等
     return p.as_uri()
 
 
-def encode_file_to_base64_uri(file_path: str) -> str:
-    """读取本地文件并返回 base64:// 前缀的内联数据（适合快速发送小文件）。"""
+# 每次读取的字节数；取 3 的倍数，保证分块编码结果可直接拼接（中间块不产生填充）
+_B64_CHUNK_SIZE = 3 * 16384
+# base64 内联的文件大小上限；更大的文件（如 PDF/ZIP）应以本地路径/file:/// 方式发送
+BASE64_INLINE_MAX_BYTES = 2 * 1024 * 1024
+
+
+def encode_file_to_base64_uri(file_path: str, max_bytes: Optional[int] = BASE64_INLINE_MAX_BYTES) -> str:
+    """读取本地文件并返回 base64:// 前缀的内联数据（适合快速发送小文件）。
+
+    按块读取并编码到同一个缓冲区，避免同时持有完整原始数据与编码结果。
+    文件超过 max_bytes 时抛出 ValueError；传 None 可取消限制。
+    """
     path = pathlib.Path(file_path).expanduser()
-    data = path.read_bytes()
-    b64 = base64.b64encode(data).decode("ascii")
-    return f"base64://{b64}"
+    if max_bytes is not None:
+        size = path.stat().st_size
+        if size > max_bytes:
+            raise ValueError(f"文件过大（{size} 字节 > {max_bytes}），请改用本地路径发送：{path}")
+    buf = bytearray(b"base64://")
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(_B64_CHUNK_SIZE)
+            if not chunk:
+                break
+            buf += base64.b64encode(chunk)
+    return buf.decode("ascii")
 
 
 def _bool_to_01(v: Union[bool, int]) -> int:
-    if isinstance(v, bool):
-        return 1 if v else 0
-    return 1 if int(v) != 0 else 0
+    return 1 if v else 0
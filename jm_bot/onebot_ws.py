@@ -18,23 +18,42 @@ OneBot v11 正向 WebSocket 客户端（统一连接地址）
 
 from __future__ import annotations
 import asyncio
+import importlib
 import json
+import random
+import sys
 import time
 from typing import Any, Dict, Optional, Tuple, Callable, List
 
 import websockets
 from websockets import WebSocketClientProtocol
-from urllib.parse import urlencode, urlparse, urlunparse, parse_qsl
+import inspect
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
 import pathlib
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # 未安装时回退到标准库 json
+
 from .config import load_config, build_ws_connect_params, AppConfig, OneBotConfig
 from .message import Message, text
 
 # -------------------------
 # 日志输出
 # -------------------------
+# (整秒时间戳, 格式化结果)：同一秒内的多条日志复用，避免每条都调用 strftime
+# 以元组整体替换，多线程同时打日志时也不会读到秒数与文本不一致的中间状态
+_ts_cache: Tuple[int, str] = (-1, "")
+
 def _ts() -> str:
-    return time.strftime("%H:%M:%S")
+    global _ts_cache
+    now = int(time.time())
+    sec, s = _ts_cache
+    if now != sec:
+        s = time.strftime("%H:%M:%S", time.localtime(now))
+        _ts_cache = (now, s)
+    return s
 
 def log_info(msg: str) -> None:
     print(f"[{_ts()}][INFO] {msg}")
@@ -45,18 +64,82 @@ def log_warn(msg: str) -> None:
 def log_err(msg: str) -> None:
     print(f"[{_ts()}][ERR ] {msg}")
 
+# 重连等待上限（秒）：连续失败时等待时间按 reconnect_interval 指数增长，直到该值
+RECONNECT_MAX_DELAY = 60.0
+# 接收缓冲的最大帧数：突发事件较多时允许更多帧排队，仍保留上限以防内存无限增长
+RECV_MAX_QUEUE = 256
+
+# -------------------------
+# JSON helpers
+# -------------------------
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """序列化为 UTF-8 JSON 字节；优先 orjson，不可用或不支持的对象回退到标准库 json。"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+def json_loads(data: Any) -> Any:
+    """解析 JSON；orjson 可直接接受 bytes/str。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# action -> 请求 JSON 的固定前缀 b'{"action":"...","params":'，按需生成后复用
+_REQUEST_PREFIXES: Dict[str, bytes] = {}
+# 无参数请求的 params 直接使用常量，不再每次创建并序列化空字典
+_EMPTY_PARAMS_JSON = b"{}"
+
+def _encode_request(action: str, params: Optional[Dict[str, Any]], echo: int) -> bytes:
+    """
+    拼接 API 请求的 JSON：信封部分（action/echo）使用预生成的字节，只序列化 params。
+    结果与 json_dumps({"action": action, "params": params or {}, "echo": echo}) 等价。
+    """
+    prefix = _REQUEST_PREFIXES.get(action)
+    if prefix is None:
+        prefix = _REQUEST_PREFIXES[action] = b'{"action":' + json_dumps(action) + b',"params":'
+    body = json_dumps(params) if params else _EMPTY_PARAMS_JSON
+    return b"".join((prefix, body, b',"echo":%d}' % echo))
+
+_LOOPBACK_HOSTS = frozenset(("127.0.0.1", "localhost", "::1"))
+
+def _ws_compression(ob: OneBotConfig) -> Optional[str]:
+    """
+    根据配置决定 websockets.connect 的 compression 参数。
+    本机连接的事件帧通常很小，压缩只增加 CPU 开销而没有带宽收益。
+    """
+    mode = ob.compression
+    if mode == "none":
+        return None
+    if mode == "auto":
+        host = (urlsplit(ob.ws_url).hostname or "").lower()
+        if host in _LOOPBACK_HOSTS:
+            return None
+    return "deflate"
+
+def _accepts_kwarg(func: Callable[..., Any], name: str) -> bool:
+    try:
+        return name in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
 # -------------------------
 # URL helpers
 # -------------------------
 def _append_query(url: str, extra_params: Dict[str, str]) -> str:
-    parsed = urlparse(url)
-    qs = dict(parse_qsl(parsed.query, keep_blank_values=True))
-    qs.update({k: v for k, v in extra_params.items() if v is not None})
-    new_query = urlencode(qs)
-    return urlunparse(parsed._replace(query=new_query))
+    parsed = urlsplit(url)
+    extra = {k: v for k, v in extra_params.items() if v is not None}
+    pairs = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k not in extra]
+    pairs.extend(extra.items())
+    new_query = urlencode(pairs)
+    return urlunsplit(parsed._replace(query=new_query))
+
+_URI_PREFIXES = ("http://", "https://", "base64://", "file://")
 
 def _to_file_uri(path: str) -> str:
-    if path.startswith("http://") or path.startswith("https://") or path.startswith("base64://") or path.startswith("file://"):
+    if path.startswith(_URI_PREFIXES):
         return path
     p = pathlib.Path(path).expanduser().resolve()
     try:
@@ -64,29 +147,40 @@ def _to_file_uri(path: str) -> str:
     except Exception:
         return str(p)
 
+async def _to_file_uri_async(path: str) -> str:
+    """本地路径的 resolve() 会访问文件系统（网络盘可能很慢），放到线程中执行；URI 直接返回。"""
+    if path.startswith(_URI_PREFIXES):
+        return path
+    return await asyncio.to_thread(_to_file_uri, path)
+
 # -------------------------
 # 工具：将数组格式消息转为终端可读文本
 # -------------------------
+def _plain_image(data: Dict[str, Any]) -> str:
+    val = data.get("file", "")
+    brief = "..." if isinstance(val, str) and len(val) > 40 else val
+    return f"[image:{brief}]"
+
+# 段类型 -> 格式化函数；未列出的类型输出 [type]
+_SEG_PLAIN: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "text": lambda data: str(data.get("text", "")),
+    "at": lambda data: f"[@{data.get('qq','')}]",
+    "image": _plain_image,
+}
+
+def _seg_to_plain(seg: Dict[str, Any]) -> str:
+    seg_type = str(seg.get("type", ""))
+    fmt = _SEG_PLAIN.get(seg_type)
+    if fmt is None:
+        return f"[{seg_type}]"
+    return fmt(seg.get("data") or {})
+
 def message_array_to_plain(m: Message) -> str:
     """
     将 OneBot 数组格式消息转为简单的终端可读文本，便于调试打印。
     非 text 段以 [type] 或 [type:brief] 形式提示。
     """
-    parts = []
-    for seg in m:
-        seg_type = str(seg.get("type", ""))
-        data = seg.get("data") or {}
-        if seg_type == "text":
-            parts.append(str(data.get("text", "")))
-        elif seg_type == "at":
-            parts.append(f"[@{data.get('qq','')}]")
-        elif seg_type == "image":
-            val = data.get("file", "")
-            brief = "..." if isinstance(val, str) and len(val) > 40 else val
-            parts.append(f"[image:{brief}]")
-        else:
-            parts.append(f"[{seg_type}]")
-    return "".join(parts)
+    return "".join(map(_seg_to_plain, m))
 
 # -------------------------
 # OneBot 客户端
@@ -97,30 +191,40 @@ class OneBotWSClient:
         self._ob: OneBotConfig = cfg.onebot
         self._ws: Optional[WebSocketClientProtocol] = None
         self._recv_task: Optional[asyncio.Task] = None
+        # 当前连接所在事件循环的 create_future（连接期间缓存）
+        self._create_future: Optional[Callable[[], asyncio.Future]] = None
+        # 当前连接的 send 是否支持 text=True（websockets>=13），可直接以文本帧发送 UTF-8 字节
+        self._send_bytes_as_text = False
 
         # echo -> Future 映射，用于关联 API 请求与响应
-        self._pending: Dict[str, asyncio.Future] = {}
+        # echo 使用自增整数，省去每次请求/响应的字符串格式化与转换
+        self._pending: Dict[int, asyncio.Future] = {}
         self._echo_seq = 0
 
         # 事件回调（可由主逻辑注入）
         self.on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+        # 每次（重新）连接成功后的回调（可由主逻辑注入，如清理与连接相关的缓存）
+        self.on_connect: Optional[Callable[[], None]] = None
 
     async def run_forever(self) -> None:
         """
         持续重连与运行。
+        连续连接失败时按指数退避（带随机抖动）等待，范围为 [reconnect_interval, RECONNECT_MAX_DELAY]，
+        连接成功后恢复为 reconnect_interval。
         """
         url, headers = build_ws_connect_params(self._ob)
+        # Normalize auth: move token to query parameter to avoid incompatibility with extra_headers
+        # 在重连循环外只计算一次，重连时直接复用
+        auth = headers.get("Authorization", "")
+        if isinstance(auth, str) and auth.startswith("Bearer "):
+            url = _append_query(url, {"access_token": auth[7:]})
         reconnect_interval = max(1, int(self._ob.reconnect_interval))
+        compression = _ws_compression(self._ob)
+        fail_count = 0
 
         while True:
             try:
                 log_info(f"Connecting OneBot WS: {url}")
-                # Normalize auth: move token to query parameter to avoid incompatibility with extra_headers
-                auth = headers.get("Authorization", "")
-                if isinstance(auth, str) and auth.startswith("Bearer "):
-                    token = auth[7:]
-                    url = _append_query(url, {"access_token": token})
-                    headers = {}
                 async with websockets.connect(
                     url,
                     open_timeout=self._ob.connect_timeout,
@@ -128,9 +232,19 @@ class OneBotWSClient:
                     ping_timeout=20,
                     close_timeout=10,
                     max_size=16 * 1024 * 1024,  # 保护：最大消息 16MB
+                    max_queue=RECV_MAX_QUEUE,
+                    compression=compression,
                 ) as ws:
                     self._ws = ws
+                    self._create_future = asyncio.get_running_loop().create_future
+                    self._send_bytes_as_text = _accepts_kwarg(ws.send, "text")
+                    fail_count = 0
                     log_info("OneBot WS connected.")
+                    if self.on_connect:
+                        try:
+                            self.on_connect()
+                        except Exception as e:
+                            log_err(f"on_connect error: {e!r}")
                     await self._handle_connected(ws)
             except asyncio.CancelledError:
                 raise
@@ -138,17 +252,24 @@ class OneBotWSClient:
                 log_warn(f"WS disconnected: {e!r}")
             finally:
                 self._ws = None
+                self._create_future = None
                 # 取消接收任务
                 if self._recv_task and not self._recv_task.done():
                     self._recv_task.cancel()
-                # 将所有 pending 置为异常
-                for echo, fut in list(self._pending.items()):
-                    if not fut.done():
-                        fut.set_exception(RuntimeError("connection lost"))
-                self._pending.clear()
-
-            log_info(f"Reconnecting after {reconnect_interval}s ...")
-            await asyncio.sleep(reconnect_interval)
+                # 将所有 pending 置为异常：先换上新字典再遍历旧字典，无需复制，也不受回调中修改的影响
+                pending, self._pending = self._pending, {}
+                if pending:
+                    exc = RuntimeError("connection lost")
+                    for fut in pending.values():
+                        if not fut.done():
+                            fut.set_exception(exc)
+
+            # 抖动在封顶之前施加：等待时间不低于 reconnect_interval，也不超过 RECONNECT_MAX_DELAY
+            delay = reconnect_interval * (2 ** min(fail_count, 6)) * random.uniform(1, 1.5)
+            delay = max(reconnect_interval, min(RECONNECT_MAX_DELAY, delay))
+            fail_count += 1
+            log_info(f"Reconnecting after {delay:.1f}s ...")
+            await asyncio.sleep(delay)
 
     async def _handle_connected(self, ws: WebSocketClientProtocol) -> None:
         self._recv_task = asyncio.create_task(self._receiver_loop(ws))
@@ -161,31 +282,53 @@ class OneBotWSClient:
     async def _receiver_loop(self, ws: WebSocketClientProtocol) -> None:
         """
         接收循环：处理事件推送与 API 响应。
+        已缓冲的帧被连续取出，期间不会让出事件循环；
+        对端正常关闭时循环结束，由 run_forever 负责重连。
+        websockets>=13 支持 recv(decode=False)：文本帧直接以 bytes 交给 JSON 解析，
+        省去库内的 UTF-8 解码（JSON 解析本身会校验编码）。
         """
-        while True:
-            raw = await ws.recv()
+        dispatch = self._dispatch_frame
+        if _accepts_kwarg(ws.recv, "decode"):
+            recv = ws.recv
             try:
-                msg = json.loads(raw)
-            except Exception:
-                log_warn(f"Non-JSON frame: {raw!r}")
-                continue
-
-            # API 响应（带 status/retcode，一般含 echo）
-            if "status" in msg or "retcode" in msg:
-                echo = str(msg.get("echo", ""))
-                fut = self._pending.pop(echo, None)
-                if fut is not None and not fut.done():
-                    fut.set_result(msg)
-                else:
-                    log_warn(f"Unmatched API response: echo={echo} resp={msg}")
-                continue
-
-            # 事件推送
-            if "post_type" in msg:
-                self._handle_event(msg)
-                continue
-
-            log_warn(f"Unknown frame: {msg}")
+                while True:
+                    dispatch(await recv(decode=False))
+            except websockets.ConnectionClosedOK:
+                pass
+        else:
+            async for raw in ws:
+                dispatch(raw)
+        log_warn("WS closed by peer.")
+
+    def _dispatch_frame(self, raw: Any) -> None:
+        try:
+            msg = json_loads(raw)
+        except Exception:
+            log_warn(f"Non-JSON frame: {raw!r}")
+            return
+
+        # API 响应（带 status/retcode，一般含 echo）
+        if "status" in msg or "retcode" in msg:
+            echo = msg.get("echo")
+            if not isinstance(echo, int):
+                # 兼容将 echo 转为字符串回传的实现
+                try:
+                    echo = int(echo)
+                except (TypeError, ValueError):
+                    echo = str(echo)
+            fut = self._pending.pop(echo, None)
+            if fut is not None and not fut.done():
+                fut.set_result(msg)
+            else:
+                log_warn(f"Unmatched API response: echo={echo} resp={msg}")
+            return
+
+        # 事件推送
+        if "post_type" in msg:
+            self._handle_event(msg)
+            return
+
+        log_warn(f"Unknown frame: {msg}")
 
     def _handle_event(self, evt: Dict[str, Any]) -> None:
         """
@@ -227,18 +370,20 @@ class OneBotWSClient:
     # API 调用
     # -------------------------
     async def call_api(self, action: str, params: Optional[Dict[str, Any]] = None, timeout: float = 20.0) -> Dict[str, Any]:
-        ws = self._require_ws()
+        ws = self._ws
+        create_future = self._create_future
+        if ws is None or create_future is None:
+            raise RuntimeError("WebSocket not connected")
         echo = self._next_echo()
-        req = {
-            "action": action,
-            "params": params or {},
-            "echo": echo,
-        }
-        payload = json.dumps(req, ensure_ascii=False)
-        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        payload = _encode_request(action, params, echo)
+        fut: asyncio.Future = create_future()
         self._pending[echo] = fut
-        await ws.send(payload)
         try:
+            # OneBot 实现通常只接受文本帧；旧版 websockets 发送 bytes 会成为二进制帧，需先解码
+            if self._send_bytes_as_text:
+                await ws.send(payload, text=True)
+            else:
+                await ws.send(payload.decode("utf-8"))
             resp = await asyncio.wait_for(fut, timeout=timeout)
             return resp
         except Exception:
@@ -283,7 +428,7 @@ class OneBotWSClient:
         返回:
           - OneBot 实现自定义的数据，若包含 message_id 则可用于合并转发节点
         """
-        uri = _to_file_uri(file_path)
+        uri = await _to_file_uri_async(file_path)
         params: Dict[str, Any] = {"user_id": int(user_id), "file": uri, "name": name or pathlib.Path(file_path).name}
         return await self.call_api("upload_private_file", params)
 
@@ -297,7 +442,7 @@ class OneBotWSClient:
           - folder: 群文件夹目录（可选）
           - timeout: API 调用超时时间（秒），默认 120 秒以适应大文件上传
         """
-        uri = _to_file_uri(file_path)
+        uri = await _to_file_uri_async(file_path)
         params: Dict[str, Any] = {"group_id": int(group_id), "file": uri, "name": name or pathlib.Path(file_path).name}
         if folder:
             params["folder"] = folder
@@ -305,14 +450,41 @@ class OneBotWSClient:
     # -------------------------
     # 内部辅助
     # -------------------------
-    def _require_ws(self) -> WebSocketClientProtocol:
-        if self._ws is None:
-            raise RuntimeError("WebSocket not connected")
-        return self._ws
-
-    def _next_echo(self) -> str:
+    def _next_echo(self) -> int:
         self._echo_seq += 1
-        return f"jm-bot-{self._echo_seq}"
+        return self._echo_seq
+
+# -------------------------
+# 事件循环
+# -------------------------
+def install_fast_loop() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """
+    若已安装则启用更快的事件循环实现：POSIX 使用 uvloop，Windows 使用 winloop。
+    Python 3.12+ 不再安装全局事件循环策略（已弃用），而是返回 new_event_loop 供 asyncio.run(loop_factory=...) 使用；
+    更早的版本调用 install() 设置策略并返回 None。均不可用时保持默认事件循环。
+    """
+    name = "winloop" if sys.platform == "win32" else "uvloop"
+    try:
+        mod = importlib.import_module(name)
+        if sys.version_info >= (3, 12):
+            factory = mod.new_event_loop
+        else:
+            mod.install()
+            factory = None
+    except Exception:
+        return None
+    log_info(f"已启用 {name} 事件循环")
+    return factory
+
+
+def run_with_fast_loop(main: Any) -> Any:
+    """
+    以 asyncio.run 运行协程，可用时使用 uvloop/winloop 事件循环。
+    """
+    loop_factory = install_fast_loop()
+    if loop_factory is not None:
+        return asyncio.run(main, loop_factory=loop_factory)
+    return asyncio.run(main)
 
 # -------------------------
 # 简易启动器（仅用于本阶段终端验证）
@@ -331,6 +503,6 @@ async def _demo_main() -> None:
 
 if __name__ == "__main__":
     try:
-        asyncio.run(_demo_main())
+        run_with_fast_loop(_demo_main())
     except KeyboardInterrupt:
         log_info("Interrupted by user")
@@ -13,28 +13,49 @@ Called by start_jm_bot.bat before launching the bot.
 """
 
 from __future__ import annotations
+import functools
 import importlib
 import subprocess
 import sys
-from typing import List, Tuple, Optional
+from typing import Any, List, Tuple, Optional
 
+try:
+    from packaging.version import InvalidVersion, Version
+except ImportError:  # packaging is optional; fall back to the numeric comparator below
+    Version = None  # type: ignore[assignment,misc]
 
-# (import_name, pip_name, version_spec, min_version_for_check)
-REQUIRES: List[Tuple[str, str, str, Optional[str]]] = [
+
+# (import_name, pip_name, version_spec, min_version_for_check, optional)
+# Optional packages only speed things up; the bot falls back when they are missing,
+# so they get a single install attempt and never fail the check.
+REQUIRES: List[Tuple[str, str, str, Optional[str], bool]] = [
     # websockets 10+ API is recommended
-    ("websockets", "websockets", ">=10.0", "10.0"),
-    ("yaml", "pyyaml", "", None),
+    ("websockets", "websockets", ">=10.0", "10.0", False),
+    ("yaml", "pyyaml", "", None, False),
     # Pillow's import name is PIL
-    ("PIL", "Pillow", "", None),
+    ("PIL", "Pillow", "", None, False),
     # For JM downloads
-    ("jmcomic", "jmcomic", "", None),
+    ("jmcomic", "jmcomic", "", None, False),
     # For encrypted ZIP compression
-    ("pyzipper", "pyzipper", "", None),
+    ("pyzipper", "pyzipper", "", None, False),
+    # Lossless JPEG -> PDF (falls back to Pillow)
+    ("img2pdf", "img2pdf", "", None, True),
+    # Faster JSON (falls back to the json stdlib)
+    ("orjson", "orjson", "", None, True),
 ]
 
+# Faster event loop: uvloop on POSIX, winloop on Windows
+if sys.platform == "win32":
+    REQUIRES.append(("winloop", "winloop", "", None, True))
+else:
+    REQUIRES.append(("uvloop", "uvloop", "", None, True))
+
 # Tsinghua mirror for better reliability in CN networks
 MIRROR = "https://pypi.tuna.tsinghua.edu.cn/simple"
 
+# Skip prompts and the self-update check on every pip invocation
+PIP_GENERAL_OPTIONS = ["--no-input", "--disable-pip-version-check"]
+
 
 def _installed_version(import_name: str) -> Optional[str]:
     try:
@@ -51,38 +72,49 @@ def _installed_version(import_name: str) -> Optional[str]:
         return None
 
 
+@functools.lru_cache(maxsize=None)
+def _numeric_version(s: str) -> Tuple[int, ...]:
+    # Leading numeric components only, trailing zeros dropped so "1.0" == "1"
+    parts: List[int] = []
+    for p in s.replace("-", ".").split("."):
+        try:
+            parts.append(int(p))
+        except Exception:
+            break
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
+@functools.lru_cache(maxsize=None)
+def _parsed_version(s: str) -> Any:
+    return Version(s)
+
+
 def _version_less_than(v: str, min_v: str) -> bool:
-    # Lightweight comparator to avoid extra dependencies (packaging.version)
-    def normalize(s: str) -> List[int]:
-        parts: List[int] = []
-        for p in s.replace("-", ".").split("."):
-            try:
-                parts.append(int(p))
-            except Exception:
-                break
-        return parts
-
-    a = normalize(v)
-    b = normalize(min_v)
-    L = max(len(a), len(b))
-    a += [0] * (L - len(a))
-    b += [0] * (L - len(b))
-    return a < b
+    # Prefer packaging.version (PEP 440 aware); lightweight numeric comparison otherwise
+    if Version is not None:
+        try:
+            return _parsed_version(v) < _parsed_version(min_v)
+        except InvalidVersion:
+            pass
+    return _numeric_version(v) < _numeric_version(min_v)
 
 
 def _run_pip(args: List[str]) -> bool:
     try:
         print(f"[PIP] {' '.join(args)}")
-        subprocess.check_call([sys.executable, "-m", "pip"] + args)
+        subprocess.check_call([sys.executable, "-m", "pip"] + PIP_GENERAL_OPTIONS + args)
         return True
     except subprocess.CalledProcessError as e:
         print(f"[ERR ] pip failed (return code {e.returncode})")
         return False
 
 
-def ensure_package(import_name: str, pip_name: str, version_spec: str = "", min_version: Optional[str] = None) -> bool:
+def ensure_package(import_name: str, pip_name: str, version_spec: str = "", min_version: Optional[str] = None, optional: bool = False) -> bool:
     """
     Ensure the package is installed and meets version requirements.
+    Optional packages get a single install attempt (no --user / mirror retries).
     Returns True if satisfied or installed successfully; False otherwise.
     """
     cur_ver = _installed_version(import_name)
@@ -103,6 +135,10 @@ def ensure_package(import_name: str, pip_name: str, version_spec: str = "", min_
     else:
         ok = _run_pip(["install", target])
 
+    if not ok and optional:
+        print(f"[SKIP] Optional package {target} could not be installed; continuing without it.")
+        return False
+
     # 2) Retry with --user
     if not ok:
         print(f"[INFO] Retry with --user: {target}")
@@ -124,13 +160,14 @@ def ensure_package(import_name: str, pip_name: str, version_spec: str = "", min_
         return False
 
     # Verify again
+    tag = "[SKIP]" if optional else "[FAIL]"
     new_ver = _installed_version(import_name)
     if not new_ver:
-        print(f"[FAIL] Installed but cannot import {import_name}. Please check your environment.")
+        print(f"{tag} Installed but cannot import {import_name}. Please check your environment.")
         return False
 
     if min_version and _version_less_than(new_ver, min_version):
-        print(f"[FAIL] {import_name} version {new_ver} is still below minimum {min_version}")
+        print(f"{tag} {import_name} version {new_ver} is still below minimum {min_version}")
         return False
 
     print(f"[OK  ] {import_name} is ready ({new_ver})")
@@ -140,8 +177,8 @@ def ensure_package(import_name: str, pip_name: str, version_spec: str = "", min_
 def main() -> int:
     print("=== JM Bot dependency check ===")
     all_ok = True
-    for import_name, pip_name, version_spec, min_version in REQUIRES:
-        if not ensure_package(import_name, pip_name, version_spec, min_version):
+    for import_name, pip_name, version_spec, min_version, optional in REQUIRES:
+        if not ensure_package(import_name, pip_name, version_spec, min_version, optional) and not optional:
             all_ok = False
     print("===============================")
     if not all_ok: